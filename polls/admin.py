@@ -1,8 +1,23 @@
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import BooleanField, Case, Count, DurationField, ExpressionWrapper, F, When
+from django.db.models.functions import Now
 from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 from django.utils import timezone
 from .models import Poll, Choice, Vote
 
+# Static status badges, built once instead of per changelist row
+_ACTIVE_HTML = mark_safe('<span style="color: green;">✓ Active</span>')
+_EXPIRED_HTML = mark_safe('<span style="color: orange;">⏰ Expired</span>')
+_EXPIRED_DAYS_HTML = mark_safe('<span style="color: red;">Expired</span>')
+
+def _decrement_vote_counts(votes):
+    """Lower each poll's vote_count by its share of the given Vote queryset"""
+    per_poll = votes.order_by().values('poll').annotate(n=Count('id'))
+    for row in per_poll:
+        Poll.objects.filter(pk=row['poll']).update(vote_count=F('vote_count') - row['n'])
+
 class ChoiceInline(admin.TabularInline):
     model = Choice
     extra = 2
@@ -22,8 +37,49 @@ class PollAdmin(admin.ModelAdmin):
     inlines = [ChoiceInline]
     actions = ['soft_delete_polls', 'restore_polls', 'extend_expiration']
 
+    def get_queryset(self, request):
+        # Compute expiry state in the database rather than per row in Python
+        queryset = super().get_queryset(request).annotate(
+            _now_expired=Case(
+                When(expires_at__lte=Now(), then=True),
+                default=False,
+                output_field=BooleanField()
+            ),
+            _days_left=ExpressionWrapper(F('expires_at') - Now(), output_field=DurationField()),
+        )
+        resolver_match = getattr(request, 'resolver_match', None)
+        changelist_url_name = f'{self.opts.app_label}_{self.opts.model_name}_changelist'
+        if resolver_match and resolver_match.url_name == changelist_url_name:
+            # The list page never renders description, slug or admin_token
+            queryset = queryset.only(
+                'question', 'created_at', 'expires_at', 'deleted_at', 'vote_count',
+                'is_anonymous', 'public_results', 'allow_multiple_choices'
+            )
+        return queryset
+
+    def save_formset(self, request, form, formset, change):
+        # Choices removed in the inline take their cascaded votes with them
+        deleted_choices = [
+            choice_form.instance.pk for choice_form in formset.deleted_forms
+            if choice_form.instance.pk is not None
+        ]
+        with transaction.atomic():
+            if deleted_choices:
+                _decrement_vote_counts(Vote.objects.filter(choice__in=deleted_choices))
+            super().save_formset(request, form, formset, change)
+
+    def _is_expired(self, obj):
+        if hasattr(obj, '_now_expired'):
+            return obj._now_expired
+        return obj.is_expired
+
+    def _days_until_expiration(self, obj):
+        if hasattr(obj, '_days_left'):
+            return max(0, obj._days_left.days) if obj._days_left is not None else None
+        return obj.days_until_expiration
+
     def total_votes_display(self, obj):
-        return obj.total_votes()
+        return obj.total_votes
     total_votes_display.short_description = 'Total Votes'
 
     def lifecycle_status(self, obj):
@@ -33,10 +89,10 @@ class PollAdmin(admin.ModelAdmin):
                 '<span style="color: red;">🗑️ Deleted ({} days until permanent)</span>',
                 days_left
             )
-        elif obj.is_expired:
-            return format_html('<span style="color: orange;">⏰ Expired</span>')
+        elif self._is_expired(obj):
+            return _EXPIRED_HTML
         else:
-            return format_html('<span style="color: green;">✓ Active</span>')
+            return _ACTIVE_HTML
     lifecycle_status.short_description = 'Status'
 
     def days_until_expiration_display(self, obj):
@@ -44,9 +100,9 @@ class PollAdmin(admin.ModelAdmin):
             return '-'
         if not obj.expires_at:
             return 'Never'
-        days = obj.days_until_expiration
-        if days == 0 and obj.is_expired:
-            return format_html('<span style="color: red;">Expired</span>')
+        days = self._days_until_expiration(obj)
+        if days == 0 and self._is_expired(obj):
+            return _EXPIRED_DAYS_HTML
         elif days <= 7:
             return format_html('<span style="color: orange;">{} days</span>', days)
         else:
@@ -66,37 +122,29 @@ class PollAdmin(admin.ModelAdmin):
             info.append(f'<strong>Soft deleted:</strong> {obj.deleted_at.strftime("%Y-%m-%d %H:%M")}')
             info.append(f'<strong>Days until permanent deletion:</strong> {obj.days_until_permanent_deletion}')
 
-        info.append(f'<strong>Total votes:</strong> {obj.total_votes()}')
+        info.append(f'<strong>Total votes:</strong> {self.total_votes_display(obj)}')
 
         return format_html('<br>'.join(info))
     lifecycle_info.short_description = 'Lifecycle Information'
 
     def soft_delete_polls(self, request, queryset):
-        count = 0
-        for poll in queryset:
-            if not poll.is_soft_deleted:
-                poll.soft_delete()
-                count += 1
+        now = timezone.now()
+        count = queryset.filter(deleted_at__isnull=True).update(deleted_at=now, updated_at=now)
         self.message_user(request, f'{count} poll(s) soft deleted.')
     soft_delete_polls.short_description = 'Soft delete selected polls'
 
     def restore_polls(self, request, queryset):
-        count = 0
-        for poll in queryset:
-            if poll.is_soft_deleted:
-                poll.restore()
-                count += 1
+        count = queryset.filter(deleted_at__isnull=False).update(deleted_at=None, updated_at=timezone.now())
         self.message_user(request, f'{count} poll(s) restored.')
     restore_polls.short_description = 'Restore soft-deleted polls'
 
     def extend_expiration(self, request, queryset):
         from datetime import timedelta
-        count = 0
-        for poll in queryset:
-            if poll.expires_at:
-                poll.expires_at = timezone.now() + timedelta(days=90)
-                poll.save()
-                count += 1
+        now = timezone.now()
+        count = queryset.filter(expires_at__isnull=False).update(
+            expires_at=now + timedelta(days=90),
+            updated_at=now
+        )
         self.message_user(request, f'Extended expiration for {count} poll(s) by 90 days.')
     extend_expiration.short_description = 'Extend expiration by 90 days'
     
@@ -117,15 +165,79 @@ class PollAdmin(admin.ModelAdmin):
     get_voting_url.short_description = 'Voting URL'
 
 class ChoiceAdmin(admin.ModelAdmin):
-    list_display = ['choice_text', 'poll', 'votes']
-    list_filter = ['poll']
+    list_display = ['choice_text', 'poll', 'votes_display']
+    list_filter = [('poll', admin.RelatedOnlyFieldListFilter)]
+    list_select_related = ('poll',)
+    raw_id_fields = ('poll',)
     search_fields = ['choice_text', 'poll__question']
 
+    def get_queryset(self, request):
+        # Join the poll outside the changelist as well
+        return super().get_queryset(request).select_related('poll').annotate(
+            _votes=Count('vote_records')
+        )
+
+    def votes_display(self, obj):
+        return obj._votes
+    votes_display.short_description = 'Votes'
+    votes_display.admin_order_field = '_votes'
+
+    # The vote page caches its choice list per poll.updated_at, so touch the poll
+    # whenever its choices change outside the poll form
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        poll_ids = [obj.poll_id]
+        if change and 'poll' in form.changed_data:
+            # The choice also leaves the poll it was moved from
+            poll_ids.append(form.initial['poll'])
+        Poll.objects.filter(pk__in=poll_ids).update(updated_at=timezone.now())
+
+    # Deleting a choice cascades to its votes, so take them off the poll's counter too
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            _decrement_vote_counts(Vote.objects.filter(choice=obj))
+            super().delete_model(request, obj)
+            Poll.objects.filter(pk=obj.poll_id).update(updated_at=timezone.now())
+
+    def delete_queryset(self, request, queryset):
+        poll_ids = list(queryset.order_by().values_list('poll', flat=True).distinct())
+        with transaction.atomic():
+            _decrement_vote_counts(Vote.objects.filter(choice__in=queryset.values('pk')))
+            super().delete_queryset(request, queryset)
+            Poll.objects.filter(pk__in=poll_ids).update(updated_at=timezone.now())
+
 class VoteAdmin(admin.ModelAdmin):
     list_display = ['poll', 'choice', 'voter_name', 'ip_address', 'voted_at']
     list_filter = ['voted_at', 'poll']
+    list_select_related = ('poll', 'choice')
+    raw_id_fields = ('poll', 'choice')
     search_fields = ['voter_name', 'ip_address']
 
+    def get_queryset(self, request):
+        # Vote.__str__ reads both the poll and the choice
+        return super().get_queryset(request).select_related('poll', 'choice')
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            if not change:
+                Poll.objects.filter(pk=obj.poll_id).update(vote_count=F('vote_count') + 1)
+            elif 'poll' in form.changed_data:
+                # Move the vote from the poll it was saved under to the new one
+                old_poll_id = Vote.objects.filter(pk=obj.pk).values_list('poll', flat=True).get()
+                Poll.objects.filter(pk=old_poll_id).update(vote_count=F('vote_count') - 1)
+                Poll.objects.filter(pk=obj.poll_id).update(vote_count=F('vote_count') + 1)
+            super().save_model(request, obj, form, change)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            Poll.objects.filter(pk=obj.poll_id).update(vote_count=F('vote_count') - 1)
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            _decrement_vote_counts(queryset)
+            super().delete_queryset(request, queryset)
+
 admin.site.register(Poll, PollAdmin)
 admin.site.register(Choice, ChoiceAdmin)
 admin.site.register(Vote, VoteAdmin)
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 from datetime import timedelta
 from polls.models import Poll
@@ -37,16 +38,17 @@ class Command(BaseCommand):
 
         if expired_count > 0:
             self.stdout.write(self.style.WARNING(f'Found {expired_count} expired poll(s):'))
-            for poll in expired_polls:
-                self.stdout.write(f'  - "{poll.question}" (expired: {poll.expires_at})')
+            # Stream the listing; the write below reuses the filter rather than an id list
+            for question, expires_at in expired_polls.values_list('question', 'expires_at').iterator(chunk_size=2000):
+                self.stdout.write(f'  - "{question}" (expired: {expires_at})')
 
             if not dry_run:
                 if force_expired:
-                    expired_polls.delete()
+                    _, deleted = expired_polls.delete()
+                    expired_count = deleted.get(Poll._meta.label, 0)
                     self.stdout.write(self.style.SUCCESS(f'  ✓ Permanently deleted {expired_count} expired poll(s)'))
                 else:
-                    for poll in expired_polls:
-                        poll.soft_delete()
+                    expired_count = expired_polls.update(deleted_at=now, updated_at=now)
                     self.stdout.write(self.style.SUCCESS(f'  ✓ Soft-deleted {expired_count} expired poll(s)'))
         else:
             self.stdout.write(self.style.SUCCESS('No expired polls found'))
@@ -62,16 +64,17 @@ class Command(BaseCommand):
 
         if old_deleted_count > 0:
             self.stdout.write(self.style.WARNING(f'Found {old_deleted_count} soft-deleted poll(s) ready for permanent deletion:'))
-            for poll in old_deleted_polls:
-                days_deleted = (now - poll.deleted_at).days
-                self.stdout.write(f'  - "{poll.question}" (deleted {days_deleted} days ago)')
+            for question, deleted_at in old_deleted_polls.values_list('question', 'deleted_at').iterator(chunk_size=2000):
+                days_deleted = (now - deleted_at).days
+                self.stdout.write(f'  - "{question}" (deleted {days_deleted} days ago)')
 
             if not dry_run:
                 # Get stats before deletion
-                total_votes = sum(poll.total_votes() for poll in old_deleted_polls)
-                total_choices = sum(poll.choices.count() for poll in old_deleted_polls)
+                total_votes = old_deleted_polls.aggregate(votes=Sum('vote_count'))['votes'] or 0
+                total_choices = old_deleted_polls.aggregate(choices=Count('choices'))['choices']
 
-                old_deleted_polls.delete()
+                _, deleted = old_deleted_polls.delete()
+                old_deleted_count = deleted.get(Poll._meta.label, 0)
                 self.stdout.write(self.style.SUCCESS(
                     f'  ✓ Permanently deleted {old_deleted_count} poll(s), '
                     f'{total_choices} choice(s), and {total_votes} vote record(s)'
@@ -82,22 +85,25 @@ class Command(BaseCommand):
         self.stdout.write('')
 
         # 3. Show statistics
-        total_polls = Poll.objects.count()
-        active_polls = Poll.active_objects.count()
-        soft_deleted_polls = Poll.objects.filter(deleted_at__isnull=False).count()
+        week_from_now = now + timedelta(days=7)
+        stats = Poll.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(deleted_at__isnull=True)),
+            soft_deleted=Count('id', filter=Q(deleted_at__isnull=False)),
+            expiring_soon=Count('id', filter=Q(
+                deleted_at__isnull=True,
+                expires_at__gt=now,
+                expires_at__lte=week_from_now
+            )),
+        )
 
         self.stdout.write(self.style.NOTICE('Database Statistics:'))
-        self.stdout.write(f'  Total polls: {total_polls}')
-        self.stdout.write(f'  Active polls: {active_polls}')
-        self.stdout.write(f'  Soft-deleted polls: {soft_deleted_polls}')
+        self.stdout.write(f'  Total polls: {stats["total"]}')
+        self.stdout.write(f'  Active polls: {stats["active"]}')
+        self.stdout.write(f'  Soft-deleted polls: {stats["soft_deleted"]}')
 
         # Show polls approaching expiration
-        week_from_now = now + timedelta(days=7)
-        expiring_soon = Poll.active_objects.filter(
-            expires_at__lte=week_from_now,
-            expires_at__gt=now
-        ).count()
-
+        expiring_soon = stats['expiring_soon']
         if expiring_soon > 0:
             self.stdout.write(self.style.WARNING(f'  Polls expiring within 7 days: {expiring_soon}'))
 
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:27
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_count(apps, schema_editor):
+    Poll = apps.get_model('polls', 'Poll')
+    Vote = apps.get_model('polls', 'Vote')
+    # Count the Vote rows; Choice.votes could drift from them and is dropped later
+    vote_rows = Vote.objects.filter(poll=OuterRef('pk')).order_by().values('poll').annotate(
+        total=Count('id')
+    ).values('total')
+    Poll.objects.update(vote_count=Coalesce(Subquery(vote_rows), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_poll_deleted_at_poll_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_vote_count, migrations.RunPython.noop),
+    ]
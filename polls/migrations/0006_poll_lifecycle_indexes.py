@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_poll_vote_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['deleted_at', 'expires_at'], name='poll_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['expires_at'], name='poll_exp_active_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:30
+
+import polls.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_poll_lifecycle_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='poll',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, default=polls.models._default_expiry, help_text='Poll will be automatically deleted after this date. Defaults to 90 days; leave blank to never expire.', null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0007_poll_expires_at_default'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='choice',
+            name='votes',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_remove_choice_votes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['poll', 'cookie_token'], name='vote_poll_cookie_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['poll', 'ip_address'], name='vote_poll_ip_idx'),
+        ),
+    ]
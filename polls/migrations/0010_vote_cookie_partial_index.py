@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0009_vote_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='vote_poll_cookie_idx',
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(condition=models.Q(('cookie_token__isnull', False)), fields=['poll', 'cookie_token'], name='vote_poll_cookie_idx'),
+        ),
+    ]
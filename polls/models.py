@@ -3,8 +3,11 @@ from django.utils.text import slugify
 from django.utils import timezone
 from datetime import timedelta
 import uuid
-import random
-import string
+import secrets
+
+def _default_expiry():
+    """Default expiration: 90 days from creation"""
+    return timezone.now() + timedelta(days=90)
 
 class ActivePollManager(models.Manager):
     """Manager that returns only active (non-deleted, non-expired) polls"""
@@ -13,10 +16,9 @@ class ActivePollManager(models.Manager):
 
     def active(self):
         """Return polls that are not deleted and not expired"""
+        now = timezone.now()
         return self.get_queryset().filter(
-            deleted_at__isnull=True
-        ).filter(
-            models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=timezone.now())
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now)
         )
 
 class Poll(models.Model):
@@ -29,12 +31,14 @@ class Poll(models.Model):
     allow_multiple_choices = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    vote_count = models.PositiveIntegerField(default=0, editable=False)
 
     # Expiration and lifecycle management
     expires_at = models.DateTimeField(
         null=True,
         blank=True,
-        help_text="Poll will be automatically deleted after this date. Leave blank for 90-day default."
+        default=_default_expiry,
+        help_text="Poll will be automatically deleted after this date. Defaults to 90 days; leave blank to never expire."
     )
     deleted_at = models.DateTimeField(
         null=True,
@@ -46,35 +50,40 @@ class Poll(models.Model):
     objects = models.Manager()  # Default manager (includes deleted polls)
     active_objects = ActivePollManager()  # Only non-deleted polls
 
-    # Track if expires_at was explicitly set
-    _expires_at_set = False
-
-    def __init__(self, *args, **kwargs):
-        # Check if expires_at is in kwargs (explicitly set by user)
-        if 'expires_at' in kwargs:
-            self._expires_at_set = True
-        super().__init__(*args, **kwargs)
+    class Meta:
+        indexes = [
+            # Lifecycle lookups used by active() and cleanup_polls
+            models.Index(fields=['deleted_at', 'expires_at'], name='poll_active_idx'),
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='poll_exp_active_idx'
+            ),
+        ]
 
     def save(self, *args, **kwargs):
-        if not self.slug:
+        # Slugs are only generated on creation; updates skip straight to the write
+        if self._state.adding and not self.slug:
             base_slug = slugify(self.question)[:50]
-            random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+            random_suffix = secrets.token_hex(6)
             self.slug = f"{base_slug}-{random_suffix}"
 
-        # Set default expiration to 90 days from creation if not explicitly set
-        if not self.pk and not self._expires_at_set and self.expires_at is None:
-            self.expires_at = timezone.now() + timedelta(days=90)
-
         super().save(*args, **kwargs)
 
+    @property
     def total_votes(self):
-        return sum(choice.votes for choice in self.choices.all())
+        """Total votes cast, read from the denormalized counter"""
+        return self.vote_count
 
     @property
     def is_expired(self):
         """Check if the poll has expired"""
+        return self.is_expired_at(timezone.now())
+
+    def is_expired_at(self, now):
+        """Check if the poll has expired as of ``now``"""
         if self.expires_at:
-            return timezone.now() > self.expires_at
+            return now > self.expires_at
         return False
 
     @property
@@ -85,9 +94,13 @@ class Poll(models.Model):
     @property
     def days_until_expiration(self):
         """Return days until expiration, or None if already expired"""
+        return self.days_until_expiration_at(timezone.now())
+
+    def days_until_expiration_at(self, now):
+        """Return days until expiration as of ``now``, or None if it never expires"""
         if not self.expires_at:
             return None
-        delta = self.expires_at - timezone.now()
+        delta = self.expires_at - now
         return max(0, delta.days) if delta.days >= 0 else 0
 
     @property
@@ -101,13 +114,17 @@ class Poll(models.Model):
 
     def soft_delete(self):
         """Mark poll as soft deleted"""
-        self.deleted_at = timezone.now()
-        self.save()
+        now = timezone.now()
+        Poll.objects.filter(pk=self.pk).update(deleted_at=now, updated_at=now)
+        self.deleted_at = now
+        self.updated_at = now
 
     def restore(self):
         """Restore a soft deleted poll"""
+        now = timezone.now()
+        Poll.objects.filter(pk=self.pk).update(deleted_at=None, updated_at=now)
         self.deleted_at = None
-        self.save()
+        self.updated_at = now
 
     def __str__(self):
         return self.question
@@ -115,7 +132,6 @@ class Poll(models.Model):
 class Choice(models.Model):
     poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='choices')
     choice_text = models.CharField(max_length=200)
-    votes = models.IntegerField(default=0)
 
     def __str__(self):
         return self.choice_text
@@ -128,5 +144,16 @@ class Vote(models.Model):
     cookie_token = models.CharField(max_length=64, blank=True, null=True, help_text="Browser cookie token to prevent duplicate votes")
     voted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Duplicate-vote lookups in has_already_voted
+            models.Index(
+                fields=['poll', 'cookie_token'],
+                condition=models.Q(cookie_token__isnull=False),
+                name='vote_poll_cookie_idx'
+            ),
+            models.Index(fields=['poll', 'ip_address'], name='vote_poll_ip_idx'),
+        ]
+
     def __str__(self):
         return f"Vote for {self.choice.choice_text} in {self.poll.question}"
@@ -1,10 +1,14 @@
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client
+from django.core.cache import cache
+from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 from polls.models import Poll, Choice, Vote
 from io import StringIO
 from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
 
 
 class PollModelTests(TestCase):
@@ -42,6 +46,12 @@ class PollModelTests(TestCase):
         poll.save()
         self.assertIsNone(poll.expires_at)
 
+    def test_slug_generated_for_new_poll_with_explicit_pk(self):
+        """Test that a new poll given its own pk still gets a slug"""
+        poll = Poll(pk=9999, question="Explicit pk?")
+        poll.save()
+        self.assertTrue(poll.slug.startswith('explicit-pk-'))
+
     def test_is_expired_property(self):
         """Test is_expired property"""
         # Active poll (expires in future)
@@ -210,6 +220,62 @@ class PollViewTests(TestCase):
         poll = Poll.objects.get(question='Never expire poll?')
         self.assertIsNone(poll.expires_at)
 
+    def test_edit_poll_updates_adds_and_removes_choices(self):
+        """Test editing a poll's choices before any votes are cast"""
+        yes, no = self.active_poll.choices.order_by('id')
+        response = self.client.post(
+            reverse('edit_poll', args=[self.active_poll.admin_token]),
+            {
+                'question': 'Edited poll?',
+                'choice_ids[]': [str(yes.id), ''],
+                'choices[]': ['Yes please', 'Maybe'],
+            }
+        )
+        self.assertEqual(response.status_code, 302)
+
+        self.active_poll.refresh_from_db()
+        self.assertEqual(self.active_poll.question, 'Edited poll?')
+        self.assertEqual(
+            list(self.active_poll.choices.order_by('id').values_list('choice_text', flat=True)),
+            ['Yes please', 'Maybe']
+        )
+        self.assertFalse(Choice.objects.filter(id=no.id).exists())
+
+    def test_vote_page_shows_edited_choices(self):
+        """Test that the cached choice list is refreshed after an edit"""
+        url = reverse('vote_page', args=[self.active_poll.slug])
+        self.assertContains(self.client.get(url), 'Yes')
+
+        yes, no = self.active_poll.choices.order_by('id')
+        self.client.post(
+            reverse('edit_poll', args=[self.active_poll.admin_token]),
+            {
+                'question': 'Active poll?',
+                'choice_ids[]': [str(yes.id), str(no.id)],
+                'choices[]': ['Absolutely', 'No'],
+            }
+        )
+
+        response = self.client.get(url)
+        self.assertContains(response, 'Absolutely')
+        self.assertNotContains(response, 'Yes')
+
+    def test_vote_page_drops_choice_moved_in_admin(self):
+        """Test that moving a choice to another poll refreshes the old poll's cached list"""
+        url = reverse('vote_page', args=[self.active_poll.slug])
+        self.assertContains(self.client.get(url), 'No')
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        moved = self.active_poll.choices.get(choice_text='No')
+        response = self.client.post(reverse('admin:polls_choice_change', args=[moved.pk]), {
+            'poll': self.expired_poll.pk,
+            'choice_text': 'Moved',
+        }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.active_poll.choices.filter(pk=moved.pk).exists())
+
+        self.assertNotContains(self.client.get(url), 'No')
+
     def test_vote_page_active_poll(self):
         """Test accessing vote page for active poll"""
         response = self.client.get(
@@ -218,6 +284,15 @@ class PollViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, self.active_poll.question)
 
+    def test_vote_page_loads_no_deferred_fields(self):
+        """Test that the vote page renders from the poll row and its choices alone"""
+        cache.clear()
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('vote_page', args=[self.active_poll.slug])
+            )
+        self.assertEqual(response.status_code, 200)
+
     def test_vote_page_expired_poll(self):
         """Test that expired polls redirect with error"""
         response = self.client.get(
@@ -240,8 +315,105 @@ class PollViewTests(TestCase):
             {'choices': str(choice.id)}
         )
         self.assertEqual(response.status_code, 302)  # Redirect
-        choice.refresh_from_db()
-        self.assertEqual(choice.votes, 0)  # No vote recorded
+        self.assertFalse(Vote.objects.filter(choice=choice).exists())  # No vote recorded
+
+    def test_voting_updates_poll_vote_count(self):
+        """Test that a recorded vote bumps the poll's vote counter"""
+        choice = self.active_poll.choices.first()
+        response = self.client.post(
+            reverse('vote', args=[self.active_poll.slug]),
+            {'choices': str(choice.id)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.active_poll.refresh_from_db()
+        self.assertEqual(self.active_poll.vote_count, 1)
+        self.assertEqual(self.active_poll.total_votes, 1)
+
+    def test_second_vote_is_rejected(self):
+        """Test that a voter can't vote twice, by cookie or by IP address"""
+        choice = self.active_poll.choices.first()
+        vote_url = reverse('vote', args=[self.active_poll.slug])
+        self.client.post(vote_url, {'choices': str(choice.id)}, REMOTE_ADDR='10.0.0.1')
+
+        # Same browser (cookie) from a different address
+        response = self.client.post(vote_url, {'choices': str(choice.id)}, REMOTE_ADDR='10.0.0.2')
+        self.assertTemplateUsed(response, 'polls/already_voted.html')
+
+        # Same address without the cookie
+        response = Client().post(vote_url, {'choices': str(choice.id)}, REMOTE_ADDR='10.0.0.1')
+        self.assertTemplateUsed(response, 'polls/already_voted.html')
+
+        self.assertEqual(Vote.objects.filter(poll=self.active_poll).count(), 1)
+
+    def test_ballot_writes_in_one_transaction(self):
+        """Test that a ballot's writes share one transaction, whatever its size"""
+        self.active_poll.allow_multiple_choices = True
+        self.active_poll.save()
+        for i in range(3):
+            Choice.objects.create(poll=self.active_poll, choice_text=f"Extra {i}")
+        choice_ids = [str(c.id) for c in self.active_poll.choices.all()]
+
+        # Poll fetch, duplicate check, choice validation, then
+        # SAVEPOINT / Vote INSERT / Poll UPDATE / RELEASE
+        with self.assertNumQueries(7):
+            self.client.post(
+                reverse('vote', args=[self.active_poll.slug]),
+                {'choices': choice_ids}
+            )
+        self.assertEqual(Vote.objects.filter(poll=self.active_poll).count(), 5)
+
+    def test_vote_page_after_voting(self):
+        """Test that the vote page shows the already-voted notice to returning voters"""
+        choice = self.active_poll.choices.first()
+        vote_page_url = reverse('vote_page', args=[self.active_poll.slug])
+        self.client.post(
+            reverse('vote', args=[self.active_poll.slug]),
+            {'choices': str(choice.id)},
+            REMOTE_ADDR='10.0.0.1'
+        )
+
+        response = self.client.get(vote_page_url, REMOTE_ADDR='10.0.0.2')
+        self.assertTemplateUsed(response, 'polls/already_voted.html')
+
+        response = Client().get(vote_page_url, REMOTE_ADDR='10.0.0.1')
+        self.assertTemplateUsed(response, 'polls/already_voted.html')
+
+        response = Client().get(vote_page_url, REMOTE_ADDR='10.0.0.3')
+        self.assertTemplateUsed(response, 'polls/vote.html')
+
+    def test_vote_ignores_invalid_choice_ids(self):
+        """Test that malformed or foreign choice ids aren't recorded"""
+        self.active_poll.allow_multiple_choices = True
+        self.active_poll.save()
+        foreign_choice = self.expired_poll.choices.first()
+        choice = self.active_poll.choices.first()
+
+        response = self.client.post(
+            reverse('vote', args=[self.active_poll.slug]),
+            {'choices': ['abc', '²', str(foreign_choice.id), str(choice.id)]}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(Vote.objects.filter(poll=self.active_poll).values_list('choice_id', flat=True)),
+            [choice.id]
+        )
+
+    def test_multiple_choice_vote_records_each_choice(self):
+        """Test that a multiple-choice ballot counts every selected choice"""
+        self.active_poll.allow_multiple_choices = True
+        self.active_poll.save()
+        choice_ids = [str(c.id) for c in self.active_poll.choices.all()]
+
+        response = self.client.post(
+            reverse('vote', args=[self.active_poll.slug]),
+            {'choices': choice_ids}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Vote.objects.filter(poll=self.active_poll).count(), 2)
+        for choice in self.active_poll.choices.all():
+            self.assertEqual(choice.vote_records.count(), 1)
+        self.active_poll.refresh_from_db()
+        self.assertEqual(self.active_poll.vote_count, 2)
 
     def test_admin_results_shows_expired_poll(self):
         """Test that admin can still view expired polls"""
@@ -310,6 +482,129 @@ class PollViewTests(TestCase):
         self.assertContains(response, 'Expiring Soon')
 
 
+class PollAdminActionTests(TestCase):
+    """Test the bulk lifecycle actions in the Django admin"""
+
+    def setUp(self):
+        """Log in as a superuser and create active and soft-deleted polls"""
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+
+        self.active_poll = Poll.objects.create(question="Active?")
+        self.deleted_poll = Poll.objects.create(question="Deleted?")
+        self.deleted_poll.soft_delete()
+
+    def run_action(self, action):
+        return self.client.post(reverse('admin:polls_poll_changelist'), {
+            'action': action,
+            '_selected_action': [self.active_poll.pk, self.deleted_poll.pk],
+        }, follow=True)
+
+    def test_soft_delete_action_skips_deleted_polls(self):
+        """Test that only polls that aren't already deleted are counted"""
+        deleted_at = Poll.objects.get(pk=self.deleted_poll.pk).deleted_at
+        response = self.run_action('soft_delete_polls')
+
+        self.assertContains(response, '1 poll(s) soft deleted.')
+        self.active_poll.refresh_from_db()
+        self.assertTrue(self.active_poll.is_soft_deleted)
+        self.deleted_poll.refresh_from_db()
+        self.assertEqual(self.deleted_poll.deleted_at, deleted_at)
+
+    def test_restore_action_only_restores_deleted_polls(self):
+        """Test that restore clears deleted_at on soft-deleted polls only"""
+        response = self.run_action('restore_polls')
+
+        self.assertContains(response, '1 poll(s) restored.')
+        self.deleted_poll.refresh_from_db()
+        self.assertFalse(self.deleted_poll.is_soft_deleted)
+
+
+class VoteCounterAdminTests(TestCase):
+    """Test that admin edits keep Poll.vote_count in step with the Vote rows"""
+
+    def setUp(self):
+        """Log in as a superuser and create two polls with a choice each"""
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+
+        self.poll = Poll.objects.create(question="First?")
+        self.choice = Choice.objects.create(poll=self.poll, choice_text="Yes")
+        self.other_poll = Poll.objects.create(question="Second?")
+        self.other_choice = Choice.objects.create(poll=self.other_poll, choice_text="No")
+
+    def add_vote(self):
+        response = self.client.post(reverse('admin:polls_vote_add'), {
+            'poll': self.poll.pk,
+            'choice': self.choice.pk,
+            'ip_address': '127.0.0.1',
+        })
+        self.assertEqual(response.status_code, 302)
+        return Vote.objects.get(poll=self.poll)
+
+    def test_add_then_delete_vote(self):
+        """Test that a vote added in the admin can be deleted again"""
+        vote = self.add_vote()
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.vote_count, 1)
+
+        response = self.client.post(
+            reverse('admin:polls_vote_delete', args=[vote.pk]), {'post': 'yes'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.vote_count, 0)
+
+    def test_moving_vote_to_another_poll(self):
+        """Test that changing a vote's poll moves it between counters"""
+        vote = self.add_vote()
+        response = self.client.post(reverse('admin:polls_vote_change', args=[vote.pk]), {
+            'poll': self.other_poll.pk,
+            'choice': self.other_choice.pk,
+            'ip_address': '127.0.0.1',
+        })
+        self.assertEqual(response.status_code, 302)
+
+        self.poll.refresh_from_db()
+        self.other_poll.refresh_from_db()
+        self.assertEqual(self.poll.vote_count, 0)
+        self.assertEqual(self.other_poll.vote_count, 1)
+
+    def test_deleting_choice_drops_its_votes_from_counter(self):
+        """Test that a choice's cascaded votes leave the poll's counter"""
+        self.add_vote()
+        response = self.client.post(
+            reverse('admin:polls_choice_delete', args=[self.choice.pk]), {'post': 'yes'}
+        )
+        self.assertEqual(response.status_code, 302)
+
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.vote_count, 0)
+        self.assertFalse(Vote.objects.filter(poll=self.poll).exists())
+
+    def test_deleting_choice_in_poll_inline_drops_its_votes(self):
+        """Test that removing a voted choice through the poll form updates the counter"""
+        self.add_vote()
+        response = self.client.post(reverse('admin:polls_poll_change', args=[self.poll.pk]), {
+            'question': self.poll.question,
+            'expires_at_0': '',
+            'expires_at_1': '',
+            'choices-TOTAL_FORMS': '1',
+            'choices-INITIAL_FORMS': '1',
+            'choices-MIN_NUM_FORMS': '0',
+            'choices-MAX_NUM_FORMS': '1000',
+            'choices-0-id': self.choice.pk,
+            'choices-0-poll': self.poll.pk,
+            'choices-0-choice_text': self.choice.choice_text,
+            'choices-0-DELETE': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.vote_count, 0)
+        self.assertFalse(Choice.objects.filter(pk=self.choice.pk).exists())
+
+
 class CleanupCommandTests(TestCase):
     """Test the cleanup_polls management command"""
 
@@ -488,3 +783,36 @@ class PollExpirationEdgeCaseTests(TestCase):
         poll = Poll.objects.create(question="Test?")
         poll.restore()  # Should not raise error
         self.assertIsNone(poll.deleted_at)
+
+
+class VoteCountMigrationTests(TransactionTestCase):
+    """Test the vote_count backfill against a pre-counter database"""
+
+    migrate_from = [('polls', '0004_poll_deleted_at_poll_expires_at')]
+    migrate_to = [('polls', '0005_poll_vote_count')]
+
+    def setUp(self):
+        """Roll the schema back to before the vote_count column"""
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        self.old_apps = executor.loader.project_state(self.migrate_from).apps
+
+    def tearDown(self):
+        """Bring the schema back up to date for the remaining tests"""
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill_counts_vote_rows(self):
+        """Test that vote_count follows the Vote rows when Choice.votes has drifted"""
+        Poll = self.old_apps.get_model('polls', 'Poll')
+        Choice = self.old_apps.get_model('polls', 'Choice')
+        Vote = self.old_apps.get_model('polls', 'Vote')
+        poll = Poll.objects.create(question="Drifted?", slug='drifted')
+        choice = Choice.objects.create(poll=poll, choice_text="Yes", votes=0)
+        Vote.objects.create(poll=poll, choice=choice, ip_address='127.0.0.1')
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        new_apps = executor.loader.project_state(self.migrate_to).apps
+
+        self.assertEqual(new_apps.get_model('polls', 'Poll').objects.get(pk=poll.pk).vote_count, 1)
@@ -1,33 +1,69 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.urls import reverse
-from django.utils import timezone
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q, prefetch_related_objects
 from datetime import timedelta
 from .models import Poll, Choice, Vote
 import secrets
 
+# Expiration periods offered by the create form, keyed by the posted value
+EXPIRATION_DELTAS = {str(days): timedelta(days=days) for days in (7, 30, 90, 180, 365)}
+
+# Rows per INSERT for bulk writes, keeping large ballots under the backend's parameter limit
+BULK_BATCH_SIZE = 500
+
+# Poll columns read by the voting views and their templates; admin_token and the
+# bookkeeping columns are left in the database
+VOTE_POLL_FIELDS = (
+    'question', 'description', 'slug', 'expires_at', 'updated_at',
+    'is_anonymous', 'allow_multiple_choices', 'public_results'
+)
+
 def get_client_ip(request):
+    # Parsed once per request; the vote flow asks for it more than once
+    ip = getattr(request, '_client_ip', None)
+    if ip is not None:
+        return ip
+
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
+        ip = x_forwarded_for.split(',', 1)[0].strip()
     else:
         ip = request.META.get('REMOTE_ADDR')
+    request._client_ip = ip
     return ip
 
 def has_already_voted(request, poll):
     """Check if user has already voted using cookie or IP address"""
-    # Check cookie first (more reliable for individual users)
+    # Match the IP address (catches cleared cookies) or the vote cookie in one query
+    already_voted = Q(ip_address=get_client_ip(request))
     vote_cookie = request.COOKIES.get(f'poll_voted_{poll.id}')
     if vote_cookie:
-        if Vote.objects.filter(poll=poll, cookie_token=vote_cookie).exists():
-            return True
-
-    # Fallback to IP check (catches cases where cookie was cleared)
-    ip_address = get_client_ip(request)
-    if Vote.objects.filter(poll=poll, ip_address=ip_address).exists():
-        return True
-
-    return False
+        already_voted |= Q(cookie_token=vote_cookie)
+
+    return Vote.objects.filter(poll=poll).filter(already_voted).exists()
+
+def already_voted_subquery(request):
+    """EXISTS over the outer poll's votes matching this visitor's IP address or vote cookies"""
+    # The poll id isn't known until the row is fetched, so match any of the visitor's
+    # vote cookies; tokens are random per ballot and only ever match their own poll
+    already_voted = Q(ip_address=get_client_ip(request))
+    vote_cookies = [
+        token for name, token in request.COOKIES.items() if name.startswith('poll_voted_')
+    ]
+    if vote_cookies:
+        already_voted |= Q(cookie_token__in=vote_cookies)
+
+    return Exists(Vote.objects.filter(already_voted, poll=OuterRef('pk')))
+
+def results_choices_prefetch():
+    """Prefetch a poll's choices annotated with their vote counts"""
+    return Prefetch(
+        'choices',
+        queryset=Choice.objects.only('id', 'poll', 'choice_text').annotate(vote_count=Count('vote_records'))
+    )
 
 def create_poll(request):
     if request.method == 'POST':
@@ -48,23 +84,26 @@ def create_poll(request):
         # Calculate expiration date
         expires_at = None
         if expiration_days != 'never':
-            try:
-                days = int(expiration_days)
-                expires_at = timezone.now() + timedelta(days=days)
-            except ValueError:
-                expires_at = timezone.now() + timedelta(days=90)  # Default to 90 days
-
-        poll = Poll.objects.create(
-            question=question,
-            description=description if description else None,
-            allow_multiple_choices=allow_multiple,
-            is_anonymous=is_anonymous,
-            public_results=public_results,
-            expires_at=expires_at
-        )
-        
-        for choice_text in choices_list:
-            Choice.objects.create(poll=poll, choice_text=choice_text)
+            delta = EXPIRATION_DELTAS.get(expiration_days)
+            if delta is None:
+                try:
+                    delta = timedelta(days=int(expiration_days))
+                except ValueError:
+                    delta = EXPIRATION_DELTAS['90']  # Default to 90 days
+            expires_at = request.now + delta
+
+        with transaction.atomic():
+            poll = Poll.objects.create(
+                question=question,
+                description=description if description else None,
+                allow_multiple_choices=allow_multiple,
+                is_anonymous=is_anonymous,
+                public_results=public_results,
+                expires_at=expires_at
+            )
+            Choice.objects.bulk_create([
+                Choice(poll=poll, choice_text=choice_text) for choice_text in choices_list
+            ], batch_size=BULK_BATCH_SIZE)
         
         voting_url = request.build_absolute_uri(reverse('vote_page', args=[poll.slug]))
         admin_url = request.build_absolute_uri(reverse('admin_results', args=[poll.admin_token]))
@@ -78,14 +117,19 @@ def create_poll(request):
     return render(request, 'polls/create_poll.html')
 
 def vote_page(request, slug):
-    poll = get_object_or_404(Poll.active_objects, slug=slug)
+    poll = get_object_or_404(
+        Poll.active_objects.only(*VOTE_POLL_FIELDS).annotate(
+            already_voted=already_voted_subquery(request)
+        ),
+        slug=slug
+    )
 
     # Check if poll is expired
-    if poll.is_expired:
+    if poll.is_expired_at(request.now):
         messages.error(request, 'This poll has expired and is no longer accepting votes.')
         return redirect('create_poll')
 
-    if has_already_voted(request, poll):
+    if poll.already_voted:
         return render(request, 'polls/already_voted.html', {'poll': poll})
 
     return render(request, 'polls/vote.html', {'poll': poll})
@@ -94,10 +138,10 @@ def vote(request, slug):
     if request.method != 'POST':
         return redirect('vote_page', slug=slug)
 
-    poll = get_object_or_404(Poll.active_objects, slug=slug)
+    poll = get_object_or_404(Poll.active_objects.only(*VOTE_POLL_FIELDS), slug=slug)
 
     # Check if poll is expired
-    if poll.is_expired:
+    if poll.is_expired_at(request.now):
         messages.error(request, 'This poll has expired and is no longer accepting votes.')
         return redirect('create_poll')
 
@@ -117,23 +161,26 @@ def vote(request, slug):
         return redirect('vote_page', slug=slug)
 
     # Generate a unique cookie token for this vote
-    cookie_token = secrets.token_urlsafe(32)
+    cookie_token = secrets.token_urlsafe(16)
 
-    for choice_id in choice_ids:
-        try:
-            choice = Choice.objects.get(id=choice_id, poll=poll)
-            choice.votes += 1
-            choice.save()
+    # Validate the whole ballot in one query; unknown or malformed ids are dropped
+    valid_ids = set(poll.choices.filter(
+        id__in=[int(choice_id) for choice_id in choice_ids if choice_id and choice_id.isdecimal()]
+    ).values_list('id', flat=True))
 
-            Vote.objects.create(
+    with transaction.atomic():
+        Vote.objects.bulk_create([
+            Vote(
                 poll=poll,
-                choice=choice,
+                choice_id=choice_id,
                 voter_name=voter_name,
                 ip_address=ip_address,
                 cookie_token=cookie_token
             )
-        except Choice.DoesNotExist:
-            pass
+            for choice_id in valid_ids
+        ], batch_size=BULK_BATCH_SIZE)
+        if valid_ids:
+            Poll.objects.filter(pk=poll.pk).update(vote_count=F('vote_count') + len(valid_ids))
 
     # Create response and set cookie
     response = render(request, 'polls/thank_you.html', {'poll': poll})
@@ -148,7 +195,7 @@ def vote(request, slug):
     return response
 
 def public_results(request, slug):
-    poll = get_object_or_404(Poll.active_objects, slug=slug)
+    poll = get_object_or_404(Poll.active_objects.prefetch_related(results_choices_prefetch()), slug=slug)
 
     if not poll.public_results:
         messages.error(request, 'Results for this poll are private.')
@@ -157,28 +204,36 @@ def public_results(request, slug):
     return render_results(request, poll, is_admin=False)
 
 def admin_results(request, admin_token):
-    poll = get_object_or_404(Poll, admin_token=admin_token)
+    poll = get_object_or_404(Poll.objects.prefetch_related(results_choices_prefetch()), admin_token=admin_token)
     return render_results(request, poll, is_admin=True)
 
 def render_results(request, poll, is_admin=False):
+    # Choices come from results_choices_prefetch(); the total is summed from those rows
     choices = poll.choices.all()
-    total_votes = sum(choice.votes for choice in choices)
-    
-    results = []
-    for choice in choices:
-        percentage = round((choice.votes / total_votes * 100) if total_votes > 0 else 0, 1)
-        results.append({
+    total_votes = sum(choice.vote_count for choice in choices)
+
+    # One division for the whole poll instead of one per choice
+    scale = (100.0 / total_votes) if total_votes else 0.0
+    results = [
+        {
             'choice_text': choice.choice_text,
-            'votes': choice.votes,
-            'percentage': percentage
-        })
+            'votes': choice.vote_count,
+            'percentage': round(choice.vote_count * scale, 1)
+        }
+        for choice in choices
+    ]
     
     voters = None
     if is_admin and not poll.is_anonymous:
-        voters = Vote.objects.filter(poll=poll).select_related('choice').order_by('-voted_at')
+        voters = Vote.objects.filter(poll=poll).select_related('choice').only(
+            'voter_name', 'voted_at', 'choice__choice_text'
+        ).order_by('-voted_at')
+        voters = Paginator(voters, 100).get_page(request.GET.get('voters_page'))
     
     return render(request, 'polls/results.html', {
         'poll': poll,
+        'is_expired': poll.is_expired_at(request.now),
+        'days_until_expiration': poll.days_until_expiration_at(request.now),
         'results': results,
         'total_votes': total_votes,
         'is_admin': is_admin,
@@ -189,9 +244,12 @@ def edit_poll(request, admin_token):
     poll = get_object_or_404(Poll, admin_token=admin_token)
     
     # Only allow editing if no votes yet
-    if poll.total_votes() > 0:
+    if poll.total_votes > 0:
         messages.error(request, 'Cannot edit poll after votes have been cast.')
         return redirect('admin_results', admin_token=admin_token)
+
+    # Both the form and the update path read every choice
+    prefetch_related_objects([poll], 'choices')
     
     if request.method == 'POST':
         poll.question = request.POST.get('question')
@@ -199,37 +257,37 @@ def edit_poll(request, admin_token):
         poll.allow_multiple_choices = request.POST.get('allow_multiple_choices') == 'on'
         poll.is_anonymous = request.POST.get('is_anonymous') == 'on'
         poll.public_results = request.POST.get('public_results') == 'on'
-        poll.save()
-        
-        # Update choices
-        existing_choice_ids = []
         choices_data = zip(
             request.POST.getlist('choice_ids[]'),
             request.POST.getlist('choices[]')
         )
-        
-        for choice_id, choice_text in choices_data:
-            choice_text = choice_text.strip()
-            if not choice_text:
-                continue
-                
-            if choice_id and choice_id.isdigit():
-                # Update existing choice
-                try:
-                    choice = Choice.objects.get(id=int(choice_id), poll=poll)
-                    choice.choice_text = choice_text
-                    choice.save()
-                    existing_choice_ids.append(int(choice_id))
-                except Choice.DoesNotExist:
-                    pass
-            else:
-                # Create new choice
-                new_choice = Choice.objects.create(poll=poll, choice_text=choice_text)
-                existing_choice_ids.append(new_choice.id)
-        
-        # Delete removed choices
-        poll.choices.exclude(id__in=existing_choice_ids).delete()
-        
+
+        with transaction.atomic():
+            poll.save()
+
+            # Update choices
+            existing_choices = {choice.id: choice for choice in poll.choices.all()}
+            updated_choices = []
+            new_choices = []
+            for choice_id, choice_text in choices_data:
+                choice_text = choice_text.strip()
+                if not choice_text:
+                    continue
+
+                if choice_id and choice_id.isdecimal():
+                    # Update existing choice
+                    choice = existing_choices.get(int(choice_id))
+                    if choice is not None:
+                        choice.choice_text = choice_text
+                        updated_choices.append(choice)
+                else:
+                    new_choices.append(Choice(poll=poll, choice_text=choice_text))
+
+            # Delete removed choices, then write updates and additions in bulk
+            poll.choices.exclude(id__in=[choice.id for choice in updated_choices]).delete()
+            Choice.objects.bulk_update(updated_choices, ['choice_text'], batch_size=BULK_BATCH_SIZE)
+            Choice.objects.bulk_create(new_choices, batch_size=BULK_BATCH_SIZE)
+
         messages.success(request, 'Poll updated successfully!')
         return redirect('admin_results', admin_token=admin_token)
     